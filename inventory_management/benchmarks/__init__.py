@@ -0,0 +1,8 @@
+"""Reproducible benchmarks for the inventory API.
+
+Run from the project directory, e.g.:
+
+    python -m benchmarks.run --passes 5000 --out bench.json
+    python -m benchmarks.run --backend mongomock --passes 1000
+    python -m benchmarks.compare before.json after.json
+"""
@@ -0,0 +1,44 @@
+"""Compare two benchmark result files produced by benchmarks.run.
+
+    python -m benchmarks.compare before.json after.json
+"""
+import argparse
+import json
+
+METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def _change(before, after):
+    if before in (None, 0) or after is None:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args(argv)
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    if before.get("data") != after.get("data"):
+        print("warning: runs used different data specs")
+
+    print(f"{'endpoint':20} {'mode':10} {'metric':15} {'before':>10} {'after':>10} {'change':>8}")
+    for endpoint in sorted(set(before["results"]) & set(after["results"])):
+        skipped = before["results"][endpoint].get("skipped") or after["results"][endpoint].get("skipped")
+        if skipped:
+            print(f"{endpoint:20} skipped: {skipped}")
+            continue
+        for mode in ("sequential", "concurrent"):
+            b = before["results"][endpoint].get(mode, {})
+            a = after["results"][endpoint].get(mode, {})
+            for metric in METRICS:
+                print(f"{endpoint:20} {mode:10} {metric:15} {str(b.get(metric)):>10} "
+                      f"{str(a.get(metric)):>10} {_change(b.get(metric), a.get(metric)):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Seeded synthetic inventory data.
+
+Passes are produced as items_in request bodies, so the same generator
+feeds both direct database seeding and the items_in benchmark.
+"""
+import random
+from datetime import date, timedelta
+
+EQUIPMENT_TYPES = ["Radar", "Transmitter", "Receiver", "Power Supply", "Display", "Antenna"]
+DEFECTS = [
+    "burnt connector", "no display", "intermittent output", "fan noise",
+    "no power", "cracked housing", "calibration drift", "loose wiring",
+]
+
+
+class DataSpec:
+    def __init__(self, passes=1000, min_items=1, max_items=8, part_numbers=500,
+                 projects=25, start=date(2023, 1, 1), days=365, seed=1234):
+        self.passes = passes
+        self.min_items = min_items
+        self.max_items = max_items
+        self.part_numbers = part_numbers
+        self.projects = projects
+        self.start = start
+        self.days = days
+        self.seed = seed
+
+    def as_dict(self):
+        return {
+            "passes": self.passes,
+            "min_items": self.min_items,
+            "max_items": self.max_items,
+            "part_numbers": self.part_numbers,
+            "projects": self.projects,
+            "start": self.start.isoformat(),
+            "days": self.days,
+            "seed": self.seed,
+        }
+
+
+def part_number(i):
+    return f"PN-{i:06d}"
+
+
+def project_name(i):
+    return f"Project {i:03d}"
+
+
+def pass_number(i):
+    return f"BP{i:07d}"
+
+
+def generate_pass_bodies(spec, first=0, count=None):
+    """Yield items_in bodies for passes first..first+count, deterministic for spec.seed."""
+    count = spec.passes if count is None else count
+    for i in range(first, first + count):
+        # One RNG per pass keeps every pass stable whatever the slice asked for
+        rng = random.Random(f"{spec.seed}:{i}")
+        items = []
+        for j in range(rng.randint(spec.min_items, spec.max_items)):
+            items.append({
+                "equipmentType": rng.choice(EQUIPMENT_TYPES),
+                "itemName": f"Module {rng.randint(1, 200)}",
+                "partNumber": part_number(rng.randrange(spec.part_numbers)),
+                "serialNumber": f"SN{i:07d}-{j:03d}",
+                "defectDetails": rng.choice(DEFECTS),
+            })
+        yield {
+            "passNo": pass_number(i),
+            "dateIn": (spec.start + timedelta(days=rng.randrange(spec.days))).isoformat(),
+            "customerName": f"Customer {rng.randint(1, 50)}",
+            "customerUnitAddress": f"Unit {rng.randint(1, 400)}",
+            "customerLocation": rng.choice(["Bengaluru", "Pune", "Hyderabad", "Chennai", "Delhi"]),
+            "customerPhoneNo": f"9{rng.randint(100000000, 999999999)}",
+            "projectName": project_name(rng.randrange(spec.projects)),
+            "items": items,
+        }
+
+
+def mark_some_out(doc, rng, fraction=0.3):
+    """Flip a share of a stored pass's items to Out so status filters have work to do."""
+    for item in doc["items"]:
+        if rng.random() < fraction:
+            item["itemOut"] = True
+            item["dateOut"] = doc["dateIn"]
+    return doc
@@ -0,0 +1,63 @@
+"""Microbenchmark: API response encoders on a search-sized payload.
+
+    python -m benchmarks.json_encoding --passes 500 --repeat 20
+
+Compares the stdlib encoder JsonResponse used (DjangoJSONEncoder) with
+myAPI.renderers.dumps (orjson when installed) and MessagePack, and checks the
+JSON encoders decode to the same value.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from .data import DataSpec, generate_pass_bodies
+
+
+def _time(fn, payload, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = fn(payload)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--passes", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "main_project.settings")
+    import django
+    django.setup()
+    from django.core.serializers.json import DjangoJSONEncoder
+    from myAPI import renderers, views
+
+    spec = DataSpec(passes=args.passes, seed=args.seed)
+    docs = [views._new_pass_doc(body, "bench") for body in generate_pass_bodies(spec)]
+    payload = {"results": docs, "count": len(docs)}
+
+    def stdlib(data):
+        return json.dumps(data, cls=DjangoJSONEncoder).encode("utf-8")
+
+    if json.loads(stdlib(payload)) != json.loads(renderers.dumps(payload)):
+        sys.exit("renderers.dumps output differs from DjangoJSONEncoder")
+
+    encoders = [("DjangoJSONEncoder", stdlib), ("renderers.dumps" + (" (orjson)" if renderers.orjson else " (stdlib)"), renderers.dumps)]
+    if renderers.msgpack is not None:
+        encoders.append(("msgpack", renderers.dumps_msgpack))
+
+    baseline = None
+    for name, fn in encoders:
+        seconds, size = _time(fn, payload, args.repeat)
+        baseline = baseline or seconds
+        print(f"{name:28} {seconds * 1000:9.2f} ms  {size / 1024:9.1f} KiB  x{baseline / seconds:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""Seed a database with synthetic passes and time the hot endpoints.
+
+Each scenario is first driven sequentially through Django's test client
+and then by a pool of concurrent workers, either in-process test clients
+or HTTP against a running server (--target http://host:port). Results
+(throughput and p50/p95/p99 per endpoint) are written as JSON so runs can
+be compared with benchmarks.compare.
+
+Point --uri/--db at a scratch database: it is dropped and reseeded.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+
+from .data import DataSpec, generate_pass_bodies, mark_some_out, part_number, pass_number, project_name
+
+
+# Scenarios a backend cannot run at all, with the reason
+UNSUPPORTED = {
+    "mongomock": {
+        "update_item_out": "mongomock does not implement $range, used by the item-out pipeline update",
+    },
+}
+
+
+def _setup_django(args):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "main_project.settings")
+    os.environ["MONGO_URI"] = args.uri
+    os.environ["MONGO_DB_NAME"] = args.db
+    if args.backend == "mongomock":
+        # Patched before setup so nothing can reach the real MONGO_URI first
+        try:
+            import mongomock
+        except ImportError:
+            sys.exit("mongomock is not installed (pip install mongomock)")
+        from myAPI import db as db_module
+        shared = mongomock.MongoClient()
+        db_module.get_client = lambda: shared
+        print("note: mongomock does not implement every pipeline operator; "
+              "use a real mongod for numbers you intend to compare", file=sys.stderr)
+    import django
+    django.setup()
+    # The app's first-request warm-up would bootstrap an admin user and build
+    # indexes against the database while seed() is dropping it
+    from django.core.signals import request_started
+    request_started.disconnect(dispatch_uid="myapi-warm-up")
+    if not args.admission:
+        # One benchmark user would otherwise hit its own per-user budgets
+        from myAPI import admission
+        admission.controller.enabled = False
+
+
+def seed(spec, batch_size=1000):
+    """Drop and refill the benchmark database; returns a session token for the bench admin."""
+    from myAPI import counters, views
+    from myAPI.db import get_db
+    from myAPI.indexes import ensure_indexes
+
+    db = get_db()
+    for name in ("product_details", "users", "sessions", "admin_projects", "api_logs", "counters"):
+        db[name].drop()
+    ensure_indexes(db)
+
+    rng = random.Random(spec.seed)
+    batch = []
+    for body in generate_pass_bodies(spec):
+        batch.append(mark_some_out(views._new_pass_doc(body, "bench"), rng))
+        if len(batch) >= batch_size:
+            views.collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        views.collection.insert_many(batch, ordered=False)
+    views.admin_projects_collection.insert_many([
+        {"projectName": project_name(i), "items": [], "version": 1} for i in range(spec.projects)
+    ])
+    counters.rebuild(views.collection, views.counters_collection)
+
+    user_id = views.users_collection.insert_one({
+        "name": "Benchmark", "username": "bench", "password_hash": "-", "role": "admin",
+        "created_at": datetime.now(timezone.utc),
+    }).inserted_id
+    token = views.generate_token()
+    views.sessions_collection.insert_one({
+        "token": token, "user_id": user_id, "role": "admin", "created_at": datetime.now(timezone.utc),
+    })
+    return token
+
+
+def scenarios(spec):
+    """name -> factory(rng) returning (method, path, body)."""
+    next_pass = [spec.passes]
+    lock = threading.Lock()
+
+    def new_pass_no():
+        with lock:
+            next_pass[0] += 1
+            return next_pass[0]
+
+    def search(rng):
+        kind = rng.choice(["ProjectName", "ItemPartNo", "DateRange"])
+        if kind == "ProjectName":
+            return "GET", f"/api/search?type=ProjectName&value={project_name(rng.randrange(spec.projects)).replace(' ', '%20')}&limit=100", None
+        if kind == "ItemPartNo":
+            return "GET", f"/api/search?type=ItemPartNo&value={part_number(rng.randrange(spec.part_numbers))}&status=In", None
+        day = spec.start.toordinal() + rng.randrange(spec.days)
+        lo, hi = date.fromordinal(day), date.fromordinal(day + 7)
+        return "GET", f"/api/search?type=DateRange&from={lo}&to={hi}", None
+
+    def search_download(rng):
+        day = spec.start.toordinal() + rng.randrange(spec.days)
+        lo, hi = date.fromordinal(day), date.fromordinal(day + 30)
+        return "GET", f"/api/search/download?type=DateRange&from={lo}&to={hi}", None
+
+    def search_suggestions(rng):
+        prefix = part_number(rng.randrange(spec.part_numbers))[: rng.randint(4, 7)]
+        return "GET", f"/api/search/suggestions?type=ItemPartNo&value={prefix}", None
+
+    def items_in(rng):
+        body = next(generate_pass_bodies(spec, first=new_pass_no(), count=1))
+        return "POST", "/api/items/in", body
+
+    def update_item_out(rng):
+        return "PUT", f"/api/items/out/{pass_number(rng.randrange(spec.passes))}", {
+            "updates": [{"index": 0, "itemOut": rng.random() < 0.5}],
+        }
+
+    return {
+        "search": search,
+        "search_download": search_download,
+        "search_suggestions": search_suggestions,
+        "items_in": items_in,
+        "update_item_out": update_item_out,
+    }
+
+
+class ClientDriver:
+    """Issue requests through Django's in-process test client."""
+
+    def __init__(self, token):
+        from django.test import Client
+        self.client = Client(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def __call__(self, method, path, body):
+        kwargs = {}
+        if body is not None:
+            kwargs = {"data": json.dumps(body), "content_type": "application/json"}
+        response = getattr(self.client, method.lower())(path, **kwargs)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response.status_code
+
+
+class HttpDriver:
+    """Issue requests against a running server."""
+
+    def __init__(self, token, base_url):
+        self.token = token
+        self.base_url = base_url.rstrip("/")
+
+    def __call__(self, method, path, body):
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method, headers={
+            "Authorization": f"Bearer {self.token}",
+            "Content-Type": "application/json",
+        })
+        try:
+            with urllib.request.urlopen(request) as response:
+                while response.read(65536):
+                    pass
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    # Nearest-rank percentile
+    index = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, statuses, elapsed):
+    values = sorted(latencies)
+    errors = sum(1 for s in statuses if s >= 400)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed else None,
+        "p50_ms": round(percentile(values, 50) * 1000, 3) if values else None,
+        "p95_ms": round(percentile(values, 95) * 1000, 3) if values else None,
+        "p99_ms": round(percentile(values, 99) * 1000, 3) if values else None,
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else None,
+    }
+
+
+def run_sequential(factory, driver, requests, seed):
+    rng = random.Random(seed)
+    latencies, statuses = [], []
+    started = time.perf_counter()
+    for _ in range(requests):
+        method, path, body = factory(rng)
+        t0 = time.perf_counter()
+        statuses.append(driver(method, path, body))
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, statuses, time.perf_counter() - started)
+
+
+def run_concurrent(factory, make_driver, requests, concurrency, seed):
+    per_worker = max(1, requests // concurrency)
+
+    def worker(n):
+        rng = random.Random(f"{seed}:{n}")
+        driver = make_driver()
+        latencies, statuses = [], []
+        for _ in range(per_worker):
+            method, path, body = factory(rng)
+            t0 = time.perf_counter()
+            statuses.append(driver(method, path, body))
+            latencies.append(time.perf_counter() - t0)
+        return latencies, statuses
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies = [v for lat, _ in results for v in lat]
+    statuses = [v for _, st in results for v in st]
+    return summarize(latencies, statuses, elapsed)
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["mongod", "mongomock"], default="mongod")
+    parser.add_argument("--uri", default=os.environ.get("BENCH_MONGO_URI", "mongodb://localhost:27017/"))
+    parser.add_argument("--db", default="inventory_bench")
+    parser.add_argument("--passes", type=int, default=2000)
+    parser.add_argument("--min-items", type=int, default=1)
+    parser.add_argument("--max-items", type=int, default=8)
+    parser.add_argument("--part-numbers", type=int, default=500)
+    parser.add_argument("--projects", type=int, default=25)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint and mode.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--target", default="client", help="'client' or a server base URL.")
+    parser.add_argument("--only", help="Comma-separated endpoints to run.")
+    parser.add_argument("--admission", action="store_true", help="Keep per-user admission control on (in-process target only).")
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse an already seeded database.")
+    parser.add_argument("--out", help="Write results JSON here.")
+    args = parser.parse_args(argv)
+
+    _setup_django(args)
+    spec = DataSpec(
+        passes=args.passes, min_items=args.min_items, max_items=args.max_items,
+        part_numbers=args.part_numbers, projects=args.projects, days=args.days, seed=args.seed,
+    )
+    if args.skip_seed:
+        from myAPI import views
+        token = views.sessions_collection.find_one({}, sort=[("created_at", -1)])["token"]
+    else:
+        t0 = time.perf_counter()
+        token = seed(spec)
+        print(f"seeded {spec.passes} passes in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+    if args.target == "client":
+        def make_driver():
+            return ClientDriver(token)
+    else:
+        def make_driver():
+            return HttpDriver(token, args.target)
+
+    selected = set(args.only.split(",")) if args.only else None
+    unsupported = UNSUPPORTED.get(args.backend, {})
+    results = {}
+    for name, factory in scenarios(spec).items():
+        if selected and name not in selected:
+            continue
+        if name in unsupported:
+            results[name] = {"skipped": unsupported[name]}
+            print(f"{name:20} skipped: {unsupported[name]}", file=sys.stderr)
+            continue
+        # Timings of a scenario that only produces errors would be meaningless
+        status = make_driver()(*factory(random.Random(f"{args.seed}:probe")))
+        if status >= 400:
+            results[name] = {"skipped": f"probe request failed with status {status}"}
+            print(f"{name:20} skipped: probe request failed with status {status}", file=sys.stderr)
+            continue
+        results[name] = {
+            "sequential": run_sequential(factory, make_driver(), args.requests, args.seed),
+            "concurrent": run_concurrent(factory, make_driver, args.requests, args.concurrency, args.seed),
+        }
+        seq, conc = results[name]["sequential"], results[name]["concurrent"]
+        print(f"{name:20} seq p50={seq['p50_ms']}ms p99={seq['p99_ms']}ms | "
+              f"x{args.concurrency} {conc['throughput_rps']} req/s p99={conc['p99_ms']}ms", file=sys.stderr)
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "backend": args.backend,
+        "target": args.target,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "data": spec.as_dict(),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Per-user admission control for the expensive read endpoints.
+
+Each endpoint listed in settings.ADMISSION_BUDGETS gets, per user, a token
+bucket (`rate` requests per second refilled up to `burst`) and a cap on
+requests in flight (`concurrency`), plus an optional cap across all users
+(`global_concurrency`). Requests over budget are turned away at once instead
+of queueing: 429 when the user is over their own budget, 503 when the
+endpoint as a whole is saturated, both with Retry-After.
+
+State lives in each worker process, so the effective budget for a user is
+the per-process budget times the number of workers they reach.
+"""
+import math
+import threading
+import time
+
+from django.conf import settings
+
+ENABLED = getattr(settings, "ADMISSION_CONTROL_ENABLED", True)
+BUDGETS = getattr(settings, "ADMISSION_BUDGETS", {})
+
+# Idle buckets are dropped once this many are tracked; a dropped bucket is full anyway
+MAX_BUCKETS = 10000
+
+
+class Rejected(Exception):
+    def __init__(self, endpoint, reason, status, retry_after):
+        super().__init__(f"Too many {endpoint} requests ({reason}), retry in {retry_after}s")
+        self.endpoint = endpoint
+        self.reason = reason
+        self.status = status
+        self.retry_after = retry_after
+
+
+class _ReleasingIterable:
+    """Wraps streaming content so the ticket is released when the response is closed."""
+
+    def __init__(self, iterable, release):
+        self._iterable = iterable
+        self._release = release
+
+    def __iter__(self):
+        return iter(self._iterable)
+
+    def close(self):
+        try:
+            close = getattr(self._iterable, "close", None)
+            if close is not None:
+                close()
+        finally:
+            self._release()
+
+
+class Ticket:
+    """An admitted request's concurrency slots; release() is idempotent."""
+
+    def __init__(self, release=None):
+        self._release = release
+        self._handed_off = False
+
+    def _do_release(self):
+        release, self._release = self._release, None
+        if release is not None:
+            release()
+
+    def release(self):
+        if not self._handed_off:
+            self._do_release()
+
+    def wrap(self, iterable):
+        """Hand the slots to streaming content; they are freed when it is closed."""
+        self._handed_off = True
+        return _ReleasingIterable(iterable, self._do_release)
+
+
+class AdmissionController:
+    def __init__(self, budgets, enabled=True):
+        self.budgets = budgets
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._buckets = {}  # (user, endpoint) -> [tokens, last refill]
+        self._in_flight = {}  # (user, endpoint) -> count
+        self._endpoint_in_flight = {}  # endpoint -> count
+        self.rejected = {}  # (endpoint, reason) -> count
+        self.admitted = {}  # endpoint -> count
+
+    def _reject(self, endpoint, reason, status, retry_after):
+        self.rejected[(endpoint, reason)] = self.rejected.get((endpoint, reason), 0) + 1
+        return Rejected(endpoint, reason, status, retry_after)
+
+    def _take_token(self, key, budget, now):
+        """Seconds until a token is available, or 0 after taking one."""
+        rate = budget.get("rate")
+        if not rate:
+            return 0
+        burst = budget.get("burst") or max(1, math.ceil(rate))
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= MAX_BUCKETS:
+                self._prune(now)
+            bucket = self._buckets[key] = [float(burst), now]
+        tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        if tokens < 1:
+            bucket[0] = tokens
+            return (1 - tokens) / rate
+        bucket[0] = tokens - 1
+        return 0
+
+    def _prune(self, now):
+        for key, (tokens, updated) in list(self._buckets.items()):
+            budget = self.budgets.get(key[1], {})
+            rate = budget.get("rate") or 0
+            burst = budget.get("burst") or max(1, math.ceil(rate))
+            if not rate or tokens + (now - updated) * rate >= burst:
+                del self._buckets[key]
+
+    def admit(self, user_key, endpoint):
+        """Return a Ticket for the request, or raise Rejected."""
+        budget = self.budgets.get(endpoint)
+        if not self.enabled or not budget:
+            return Ticket()
+        key = (user_key, endpoint)
+        with self._lock:
+            limit = budget.get("global_concurrency")
+            if limit and self._endpoint_in_flight.get(endpoint, 0) >= limit:
+                raise self._reject(endpoint, "endpoint_concurrency", 503, 1)
+            limit = budget.get("concurrency")
+            if limit and self._in_flight.get(key, 0) >= limit:
+                raise self._reject(endpoint, "user_concurrency", 429, 1)
+            wait = self._take_token(key, budget, time.monotonic())
+            if wait:
+                raise self._reject(endpoint, "rate", 429, max(1, math.ceil(wait)))
+            self._in_flight[key] = self._in_flight.get(key, 0) + 1
+            self._endpoint_in_flight[endpoint] = self._endpoint_in_flight.get(endpoint, 0) + 1
+            self.admitted[endpoint] = self.admitted.get(endpoint, 0) + 1
+        return Ticket(lambda: self._release(key, endpoint))
+
+    def _release(self, key, endpoint):
+        with self._lock:
+            remaining = self._in_flight.get(key, 0) - 1
+            if remaining > 0:
+                self._in_flight[key] = remaining
+            else:
+                self._in_flight.pop(key, None)
+            self._endpoint_in_flight[endpoint] = max(0, self._endpoint_in_flight.get(endpoint, 0) - 1)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "admitted": dict(self.admitted),
+                "rejected": dict(self.rejected),
+                "in_flight": dict(self._endpoint_in_flight),
+            }
+
+
+controller = AdmissionController(BUDGETS, enabled=ENABLED)
@@ -1,6 +1,53 @@
+import os
+import threading
+
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.signals import request_started
 
 
 class MyapiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'myAPI'
+
+    # pid of the process whose warm-up has started
+    _warmed_pid = None
+    _warm_lock = threading.Lock()
+
+    def ready(self):
+        if not getattr(settings, "MYAPI_WARM_UP", True):
+            return
+        # Warm up on the first request a process serves rather than at import:
+        # that is always after a pre-fork server (gunicorn --preload) has forked,
+        # and management commands, benchmarks and scripts never trigger it
+        request_started.connect(self._on_request_started, dispatch_uid="myapi-warm-up")
+
+    @classmethod
+    def _on_request_started(cls, **kwargs):
+        pid = os.getpid()
+        if cls._warmed_pid == pid:
+            return
+        with cls._warm_lock:
+            if cls._warmed_pid == pid:
+                return
+            cls._warmed_pid = pid
+        # Off the request path so an unreachable Mongo doesn't delay the response
+        threading.Thread(target=cls._warm_up, name="myapi-warm-up", daemon=True).start()
+
+    @staticmethod
+    def _warm_up():
+        import logging
+        from .db import get_db
+        from .indexes import warn_missing_indexes
+        from .views import ensure_default_admin, suggestion_index
+        logger = logging.getLogger(__name__)
+        try:
+            if ensure_default_admin():
+                logger.warning("Created default admin user; change its password")
+        except Exception as e:
+            logger.warning("Could not bootstrap admin user: %s", e)
+        warn_missing_indexes(get_db())
+        try:
+            suggestion_index.ensure_built()
+        except Exception as e:
+            logger.warning("Could not build suggestion index: %s", e)
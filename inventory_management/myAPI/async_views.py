@@ -0,0 +1,322 @@
+"""Async versions of the hot read endpoints for ASGI deployments.
+
+They share the query building, caches and response shaping in views.py and
+only swap the blocking pymongo calls for the async driver. urls.py routes to
+them when settings.MYAPI_ASYNC_VIEWS is on; everything else (and every
+write) still runs through the synchronous views.
+
+Downloads keep their synchronous views but hand ASGI an async iterator, since
+Django would otherwise read a sync streaming body fully into memory first.
+"""
+import traceback
+
+from asgiref.sync import sync_to_async
+from django.views.decorators.csrf import csrf_exempt
+
+from . import metrics, views
+from .db import get_async_db
+from .renderers import ApiResponse
+from .views import (
+    DOCUMENT_PROJECTION,
+    SEARCH_PROJECTION,
+    _cache_session_user,
+    _check_role,
+    _conditional_json,
+    _parse_facets,
+    _plan_faceted_search,
+    _plan_search,
+    _project_items_entry,
+    _projects_entry,
+    _search_pipeline,
+    _search_response,
+    _session_seconds_left,
+    _shape_facets,
+    admit,
+    auth_cache,
+    catalog_cache,
+    document_cache,
+    get_auth_token_from_request,
+    log_api_response,
+    suggestion_index,
+)
+
+
+def _collection(name):
+    return get_async_db()[name]
+
+
+async def _find_search_docs(query, params, projection, sort=None, limit=None, skip=None):
+    coll = _collection("product_details")
+    pipeline = _search_pipeline(query, params, projection, sort=sort, limit=limit, skip=skip)
+    if pipeline is not None:
+        cursor = await coll.aggregate(pipeline)
+        return await cursor.to_list()
+    cursor = coll.find(query, projection)
+    if sort:
+        cursor = cursor.sort(sort)
+    if skip:
+        cursor = cursor.skip(skip)
+    if limit:
+        cursor = cursor.limit(limit)
+    return await cursor.to_list()
+
+
+# ----------------------
+# Auth helpers
+# ----------------------
+async def get_user_from_token(request):
+    token = get_auth_token_from_request(request)
+    if not token:
+        return None
+    user = auth_cache.get(token)
+    if user is not None:
+        return user
+    session = await _collection("sessions").find_one({"token": token})
+    if not session or _session_seconds_left(session) <= 0:
+        return None
+    user = await _collection("users").find_one({"_id": session.get("user_id")})
+    return _cache_session_user(token, session, user)
+
+
+async def require_auth(request, role: str | None = None):
+    with metrics.timed("auth"):
+        return _check_role(await get_user_from_token(request), role)
+
+
+# ----------------------
+# Endpoints
+# ----------------------
+@csrf_exempt
+async def validate_token(request):
+    if request.method != "GET":
+        error_response = {"error": "Only GET allowed"}
+        log_api_response("validate_token", request.method, None, error_response)
+        return ApiResponse(error_response, status=405)
+
+    try:
+        # The session lookup can fail too (Mongo unreachable); answer with the usual JSON 500
+        user, err = await require_auth(request)
+        if err:
+            return err
+
+        response = {
+            "valid": True,
+            "username": user.get("username"),
+            "role": user.get("role"),
+            "name": user.get("name")
+        }
+        log_api_response("validate_token", request.method, None, response)
+        return ApiResponse(response)
+    except Exception as e:
+        stack_trace = traceback.format_exc()
+        error_response = {"error": str(e)}
+        log_api_response("validate_token", request.method, None, {**error_response, "stack_trace": stack_trace})
+        return ApiResponse(error_response, status=500)
+
+
+@csrf_exempt
+async def edit_record(request, pass_no):
+    if request.method != "GET":
+        # Writes keep their synchronous implementation
+        return await sync_to_async(views.edit_record)(request, pass_no)
+
+    user, err = await require_auth(request)
+    if err:
+        return err
+    try:
+        doc = document_cache.get(pass_no)
+        cached = doc is not None
+        if not cached:
+            generation = document_cache.generation()
+            doc = await _collection("product_details").find_one({"passNo": pass_no}, DOCUMENT_PROJECTION)
+            if doc:
+                document_cache.set(pass_no, doc, generation=generation)
+        if not doc:
+            response = {"error": "Entry Not found"}
+            log_api_response("edit_record", request.method, {"passNo": pass_no}, response)
+            return ApiResponse(response, status=404)
+        log_api_response("edit_record", request.method, {"passNo": pass_no}, {"items": len(doc.get("items") or []), "cached": cached})
+        return ApiResponse(doc, safe=False)
+    except Exception as e:
+        stack_trace = traceback.format_exc()
+        error_response = {"error": str(e)}
+        log_api_response("edit_record", request.method, {"passNo": pass_no}, {**error_response, "stack_trace": stack_trace})
+        return ApiResponse(error_response, status=500)
+
+
+async def search(request):
+    if request.method != "GET":
+        error_response = {"error": "Only GET allowed"}
+        log_api_response("search", request.method, dict(request.GET), error_response)
+        return ApiResponse(error_response, status=405)
+
+    user, err = await require_auth(request)
+    if err:
+        return err
+    ticket, err = admit(request, user, "search")
+    if err:
+        return err
+
+    try:
+        params = request.GET
+        if params.get("type") == "ProjectName" and views._project_keys_due():
+            # Refresh here so planning the query never blocks the event loop
+            unkeyed = await _collection("product_details").find_one(views.UNKEYED_PROJECTS, {"_id": 1})
+            views._note_project_keys(unkeyed is None)
+        try:
+            facets = _parse_facets(params)
+            if facets:
+                pipeline, limit, serial_no, skip = _plan_faceted_search(params, facets)
+            else:
+                query, sort, limit, serial_no, skip = _plan_search(params)
+        except ValueError as e:
+            response = {"error": str(e)}
+            log_api_response("search", request.method, dict(params), response)
+            return ApiResponse(response, status=400)
+
+        if facets:
+            cursor = await _collection("product_details").aggregate(pipeline, allowDiskUse=True)
+            result = next(iter(await cursor.to_list()), {})
+            response = _search_response(result.get("results", []), limit, serial_no, skip)
+            response["facets"] = _shape_facets(result, facets)
+        else:
+            docs = await _find_search_docs(query, params, SEARCH_PROJECTION, sort=sort, limit=limit, skip=skip)
+            response = _search_response(docs, limit, serial_no, skip)
+        log_api_response("search", request.method, dict(params), {"count": response["count"]})
+        return ApiResponse(response)
+
+    except Exception as e:
+        stack_trace = traceback.format_exc()
+        error_response = {"error": str(e)}
+        log_api_response("search", request.method, dict(request.GET), {**error_response, "stack_trace": stack_trace})
+        return ApiResponse(error_response, status=500)
+    finally:
+        ticket.release()
+
+
+@csrf_exempt
+async def search_suggestions(request):
+    if request.method != "GET":
+        error_response = {"error": "Only GET allowed"}
+        log_api_response("search_suggestions", request.method, dict(request.GET), error_response)
+        return ApiResponse(error_response, status=405)
+
+    user, err = await require_auth(request)
+    if err:
+        return err
+    ticket, err = admit(request, user, "search_suggestions")
+    if err:
+        return err
+
+    try:
+        params = request.GET
+        search_type = params.get("type")
+        value = (params.get("value") or "").strip()
+        if not search_type or not value:
+            response = {"error": "type and value are required"}
+            log_api_response("search_suggestions", request.method, dict(params), response)
+            return ApiResponse(response, status=400)
+
+        index = suggestion_index.lookup(search_type)
+        if index is None:
+            response = {"error": "Invalid type"}
+            log_api_response("search_suggestions", request.method, dict(params), response)
+            return ApiResponse(response, status=400)
+
+        if suggestion_index.built:
+            suggestion_index.ensure_built()
+        else:
+            # The first build reads Mongo synchronously, so keep it off the event loop
+            await sync_to_async(suggestion_index.ensure_built, thread_sensitive=False)()
+        suggestions = index.search(value, limit=10)
+        response = {"suggestions": suggestions}
+        log_api_response("search_suggestions", request.method, dict(params), {"count": len(suggestions)})
+        return ApiResponse(response)
+    except Exception as e:
+        stack_trace = traceback.format_exc()
+        error_response = {"error": str(e)}
+        log_api_response("search_suggestions", request.method, dict(request.GET), {**error_response, "stack_trace": stack_trace})
+        return ApiResponse(error_response, status=500)
+    finally:
+        ticket.release()
+
+
+async def admin_get_projects(request):
+    """Get all projects"""
+    user, err = await require_auth(request)
+    if err:
+        return err
+    if request.method != "GET":
+        return ApiResponse({"error": "Only GET allowed"}, status=405)
+    try:
+        entry = catalog_cache.get("projects")
+        if entry is None:
+            generation = catalog_cache.generation()
+            projects = await _collection("admin_projects").find({}, {"_id": 0, "projectName": 1}).to_list()
+            entry = _projects_entry(projects)
+            catalog_cache.set("projects", entry, generation=generation)
+        return _conditional_json(request, entry)
+    except Exception as e:
+        return ApiResponse({"error": str(e)}, status=500)
+
+
+async def admin_get_project_items(request):
+    """Get all items for a project"""
+    user, err = await require_auth(request)
+    if err:
+        return err
+    if request.method != "GET":
+        return ApiResponse({"error": "Only GET allowed"}, status=405)
+    try:
+        project_name = request.GET.get("projectName", "").strip()
+        if not project_name:
+            return ApiResponse({"error": "Project name required"}, status=400)
+        entry = catalog_cache.get(("items", project_name))
+        if entry is None:
+            generation = catalog_cache.generation()
+            doc = await _collection("admin_projects").find_one({"projectName": project_name}, {"_id": 0, "items": 1, "version": 1})
+            if not doc:
+                return ApiResponse({"error": "Project not found"}, status=404)
+            entry = _project_items_entry(project_name, doc)
+            catalog_cache.set(("items", project_name), entry, generation=generation)
+        return _conditional_json(request, entry)
+    except Exception as e:
+        return ApiResponse({"error": str(e)}, status=500)
+
+
+# ----------------------
+# Downloads
+# ----------------------
+_DONE = object()
+
+
+class _AsyncChunks:
+    """Pull a sync streaming body one chunk at a time on a worker thread."""
+
+    def __init__(self, iterable):
+        self._iterator = iter(iterable)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        chunk = await sync_to_async(next, thread_sensitive=False)(self._iterator, _DONE)
+        if chunk is _DONE:
+            raise StopAsyncIteration
+        return chunk
+
+
+def _stream_async(response):
+    # The original closers (cursor, admission ticket, open file) stay registered
+    if getattr(response, "streaming", False) and not response.is_async:
+        response.streaming_content = _AsyncChunks(response.streaming_content)
+    return response
+
+
+@csrf_exempt
+async def search_download(request):
+    return _stream_async(await sync_to_async(views.search_download)(request))
+
+
+async def export_file(request, job_id):
+    return _stream_async(await sync_to_async(views.export_file)(request, job_id))
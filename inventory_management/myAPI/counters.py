@@ -0,0 +1,149 @@
+"""Live In/Out item counters kept in the `counters` collection.
+
+Writes to product_details report the documents before and after the change;
+the difference is applied with $inc so /api/stats never scans passes.
+`manage.py rebuild_counters` recomputes everything from scratch whenever the
+counters may have drifted (e.g. after writes made outside the API).
+"""
+import logging
+from collections import Counter
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# Fields a write must fetch from product_details to report counter deltas
+COUNTER_FIELDS = {"projectName": 1, "items.partNumber": 1, "items.itemIn": 1, "items.itemOut": 1}
+
+DIMENSIONS = ("total", "project", "part")
+
+
+def item_status(item):
+    """'out', 'in' or None, using the same rules as the search status filter."""
+    if item.get("itemIn") is not True:
+        return None
+    return "out" if item.get("itemOut") is True else "in"
+
+
+def tally(doc):
+    """Counter of (dimension, key, status) -> items for one pass document."""
+    counts = Counter()
+    if not doc:
+        return counts
+    project = doc.get("projectName")
+    for item in doc.get("items") or []:
+        status = item_status(item)
+        if status is None:
+            continue
+        counts[("total", "", status)] += 1
+        if project:
+            counts[("project", project, status)] += 1
+        if item.get("partNumber"):
+            counts[("part", item["partNumber"], status)] += 1
+    return counts
+
+
+def _counter_id(dimension, key):
+    return f"{dimension}:{key}"
+
+
+def _inc_operations(delta):
+    merged = {}
+    for (dimension, key, status), n in delta.items():
+        if n:
+            merged.setdefault((dimension, key), {})[status] = n
+    return [
+        UpdateOne(
+            {"_id": _counter_id(dimension, key)},
+            {"$inc": incs, "$setOnInsert": {"dim": dimension, "key": key}},
+            upsert=True,
+        )
+        for (dimension, key), incs in merged.items()
+    ]
+
+
+def record_changes(counters_collection, changes):
+    """Apply counter deltas for a list of (before, after) pass documents.
+
+    Either side may be None for inserts and deletes. The main write has
+    already succeeded, so failures are logged rather than raised.
+    """
+    delta = Counter()
+    for before, after in changes:
+        delta.update(tally(after))
+        delta.subtract(tally(before))
+    operations = _inc_operations(delta)
+    if not operations:
+        return
+    try:
+        counters_collection.bulk_write(operations, ordered=False)
+    except Exception as e:
+        logger.warning("Could not update inventory counters: %s", e)
+
+
+def rebuild(product_collection, counters_collection):
+    """Recompute every counter with one aggregation and swap the result in.
+
+    The new counters are written to a scratch collection and renamed over
+    the live one, so readers never see it empty or half filled.
+    """
+    status = {"$cond": [
+        {"$and": [{"$eq": ["$items.itemIn", True]}, {"$eq": ["$items.itemOut", True]}]},
+        "out",
+        {"$cond": [{"$eq": ["$items.itemIn", True]}, "in", None]},
+    ]}
+    pipeline = [
+        {"$unwind": "$items"},
+        {"$project": {"projectName": 1, "partNumber": "$items.partNumber", "status": status}},
+        {"$match": {"status": {"$ne": None}}},
+        {"$facet": {
+            "total": [{"$group": {"_id": {"key": "", "status": "$status"}, "n": {"$sum": 1}}}],
+            "project": [
+                {"$match": {"projectName": {"$nin": [None, ""]}}},
+                {"$group": {"_id": {"key": "$projectName", "status": "$status"}, "n": {"$sum": 1}}},
+            ],
+            "part": [
+                {"$match": {"partNumber": {"$nin": [None, ""]}}},
+                {"$group": {"_id": {"key": "$partNumber", "status": "$status"}, "n": {"$sum": 1}}},
+            ],
+        }},
+    ]
+    facets = next(product_collection.aggregate(pipeline, allowDiskUse=True), {})
+    docs = {}
+    for dimension in DIMENSIONS:
+        for group in facets.get(dimension, []):
+            key = group["_id"]["key"]
+            doc = docs.setdefault(_counter_id(dimension, key), {
+                "_id": _counter_id(dimension, key), "dim": dimension, "key": key, "in": 0, "out": 0,
+            })
+            doc[group["_id"]["status"]] = group["n"]
+    if not docs:
+        counters_collection.delete_many({})
+        return 0
+    scratch = counters_collection.database[f"{counters_collection.name}_rebuild"]
+    scratch.drop()
+    scratch.insert_many(list(docs.values()), ordered=False)
+    scratch.rename(counters_collection.name, dropTarget=True)
+    return len(docs)
+
+
+def read_stats(counters_collection, project_name=None, part_number=None):
+    """Totals plus per-project and per-part-number In/Out counts."""
+    query = {}
+    if project_name or part_number:
+        ids = [_counter_id("total", "")]
+        if project_name:
+            ids.append(_counter_id("project", project_name))
+        if part_number:
+            ids.append(_counter_id("part", part_number))
+        query = {"_id": {"$in": ids}}
+    stats = {"totals": {"in": 0, "out": 0}, "byProject": {}, "byPartNumber": {}}
+    for doc in counters_collection.find(query):
+        counts = {"in": doc.get("in", 0), "out": doc.get("out", 0)}
+        if doc.get("dim") == "total":
+            stats["totals"] = counts
+        elif doc.get("dim") == "project":
+            stats["byProject"][doc["key"]] = counts
+        elif doc.get("dim") == "part":
+            stats["byPartNumber"][doc["key"]] = counts
+    return stats
@@ -0,0 +1,86 @@
+"""Per-process Mongo client configured from settings.
+
+The client is created on first use in each process, so importing the views
+never touches the network and pre-fork servers get a fresh client (and
+connection pool) in every worker instead of one inherited across fork().
+"""
+import os
+import threading
+
+from django.conf import settings
+from pymongo import MongoClient
+
+from . import metrics
+
+_client = None
+_client_pid = None
+_async_client = None
+_async_client_pid = None
+_lock = threading.Lock()
+
+
+def _client_options():
+    return {
+        "maxPoolSize": getattr(settings, "MONGO_MAX_POOL_SIZE", 100),
+        "minPoolSize": getattr(settings, "MONGO_MIN_POOL_SIZE", 0),
+        "serverSelectionTimeoutMS": getattr(settings, "MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000),
+        "connectTimeoutMS": getattr(settings, "MONGO_CONNECT_TIMEOUT_MS", 5000),
+        "socketTimeoutMS": getattr(settings, "MONGO_SOCKET_TIMEOUT_MS", None),
+        "appname": getattr(settings, "MONGO_APPNAME", "inventory_management"),
+        "connect": False,
+        "event_listeners": [metrics.command_listener] if metrics.ENABLED else [],
+    }
+
+
+def get_client():
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+    with _lock:
+        if _client is None or _client_pid != pid:
+            # A client inherited from the parent process is never reused or closed here
+            _client = MongoClient(settings.MONGO_URI, **_client_options())
+            _client_pid = pid
+    return _client
+
+
+def get_db():
+    return get_client()[settings.MONGO_DB_NAME]
+
+
+def get_async_client():
+    """AsyncMongoClient for the ASGI views, bound to the serving event loop."""
+    global _async_client, _async_client_pid
+    from pymongo import AsyncMongoClient
+
+    pid = os.getpid()
+    if _async_client is None or _async_client_pid != pid:
+        _async_client = AsyncMongoClient(settings.MONGO_URI, **_client_options())
+        _async_client_pid = pid
+    return _async_client
+
+
+def get_async_db():
+    return get_async_client()[settings.MONGO_DB_NAME]
+
+
+def ping():
+    """Round trip to the server; raises once server selection times out."""
+    get_client().admin.command("ping")
+
+
+class LazyCollection:
+    """Module-level stand-in for a Collection that resolves on first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+
+    def get(self):
+        return get_db()[self._name]
+
+    def __getattr__(self, attr):
+        return getattr(self.get(), attr)
+
+    def __repr__(self):
+        return f"LazyCollection({self._name!r})"
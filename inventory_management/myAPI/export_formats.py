@@ -0,0 +1,224 @@
+"""Encoders for search_download: CSV, gzip CSV, NDJSON and XLSX.
+
+Every encoder takes the header and an iterator of rows from
+views._export_rows and yields chunks as it goes, so memory stays flat
+however large the export is. XLSX is written as a zip on a non-seekable
+stream (data descriptors, inline strings), with dates stored as real
+date cells and everything else except the serial number stored as text.
+"""
+import csv
+import re
+import zipfile
+import zlib
+from datetime import date, datetime
+from xml.sax.saxutils import escape
+
+from .renderers import dumps
+
+# Columns XLSX stores as numbers and as dates; everything else is text
+NUMBER_COLUMNS = {"Sl No."}
+DATE_COLUMNS = {"Date In", "Date Out"}
+
+GZIP_LEVEL = 6
+# Encoders hold output back until they have at least this much to send
+CHUNK_BYTES = 64 * 1024
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def encode_csv(header, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def encode_csv_gzip(header, rows):
+    """CSV compressed as a single gzip member, emitted in chunks of at least CHUNK_BYTES."""
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    pending = []
+    size = 0
+    for line in encode_csv(header, rows):
+        chunk = compressor.compress(line.encode("utf-8"))
+        if chunk:
+            pending.append(chunk)
+            size += len(chunk)
+            if size >= CHUNK_BYTES:
+                yield b"".join(pending)
+                pending, size = [], 0
+    pending.append(compressor.flush())
+    yield b"".join(pending)
+
+
+def encode_ndjson(header, rows):
+    for row in rows:
+        yield dumps(dict(zip(header, row))) + b"\n"
+
+
+# ----------------------
+# XLSX
+# ----------------------
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Inventory" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+# Cell styles: 0 default, 1 date (yyyy-mm-dd), 2 bold header
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="yyyy-mm-dd"/></numFmts>'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '</styleSheet>'
+)
+
+_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/></sheetView></sheetViews>'
+    '<sheetData>'
+)
+_SHEET_END = '</sheetData></worksheet>'
+
+_EXCEL_EPOCH = date(1899, 12, 30)
+_ILLEGAL_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+
+class _Drain:
+    """Non-seekable sink for zipfile; take() returns and clears what was written."""
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _text_cell(value, style=0):
+    text = escape(_ILLEGAL_XML.sub("", str(value)))
+    style_attr = f' s="{style}"' if style else ""
+    return f'<c t="inlineStr"{style_attr}><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _cell(kind, value):
+    if value is None or value == "":
+        return "<c/>"
+    if kind == "number" and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"<c><v>{value}</v></c>"
+    if kind == "date":
+        day = value.date() if isinstance(value, datetime) else value if isinstance(value, date) else None
+        if day is None and isinstance(value, str) and _ISO_DATE.match(value):
+            try:
+                day = date.fromisoformat(value[:10])
+            except ValueError:
+                day = None
+        if day is not None:
+            return f'<c s="1"><v>{(day - _EXCEL_EPOCH).days}</v></c>'
+    return _text_cell(value)
+
+
+def _sheet_rows(header, rows):
+    kinds = ["number" if h in NUMBER_COLUMNS else "date" if h in DATE_COLUMNS else "text" for h in header]
+    yield "<row>" + "".join(_text_cell(h, style=2) for h in header) + "</row>"
+    for row in rows:
+        yield "<row>" + "".join(_cell(kind, value) for kind, value in zip(kinds, row)) + "</row>"
+
+
+def encode_xlsx(header, rows, flush_bytes=CHUNK_BYTES):
+    sink = _Drain()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _ROOT_RELS)
+        archive.writestr("xl/workbook.xml", _WORKBOOK)
+        archive.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        archive.writestr("xl/styles.xml", _STYLES)
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(_SHEET_START.encode("utf-8"))
+            buffered = []
+            size = 0
+            for line in _sheet_rows(header, rows):
+                data = line.encode("utf-8")
+                buffered.append(data)
+                size += len(data)
+                if size >= flush_bytes:
+                    sheet.write(b"".join(buffered))
+                    buffered, size = [], 0
+                    chunk = sink.take()
+                    if chunk:
+                        yield chunk
+            buffered.append(_SHEET_END.encode("utf-8"))
+            sheet.write(b"".join(buffered))
+    yield sink.take()
+
+
+class ExportFormat:
+    def __init__(self, encode, content_type, extension):
+        self.encode = encode
+        self.content_type = content_type
+        self.extension = extension
+
+
+EXPORT_FORMATS = {
+    "csv": ExportFormat(encode_csv, "text/csv", "csv"),
+    "csv.gz": ExportFormat(encode_csv_gzip, "application/gzip", "csv.gz"),
+    "ndjson": ExportFormat(encode_ndjson, "application/x-ndjson", "ndjson"),
+    "xlsx": ExportFormat(
+        encode_xlsx, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx",
+    ),
+}
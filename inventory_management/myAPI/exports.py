@@ -0,0 +1,327 @@
+"""Background export jobs for POST /api/exports.
+
+The web process only records a job in `export_jobs`; `manage.py
+run_export_worker` claims queued jobs, writes the file under
+settings.EXPORT_DIR and reports progress on the job document. Web and worker
+processes must share that directory.
+
+Every write to product_details bumps a version number in `data_versions`.
+A job remembers the version it was queued at, and a finished file is reused
+for an identical query only while that version is still current.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import secrets
+import socket
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from pymongo import ReturnDocument
+
+from .db import LazyCollection
+from .export_formats import EXPORT_FORMATS
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = Path(getattr(settings, "EXPORT_DIR", Path(settings.BASE_DIR) / "exports"))
+EXPORT_RETENTION_SECONDS = getattr(settings, "EXPORT_RETENTION_SECONDS", 24 * 60 * 60)
+# A running job whose heartbeat is older than this is assumed orphaned and requeued
+EXPORT_STALE_SECONDS = getattr(settings, "EXPORT_STALE_SECONDS", 300)
+# How often a running job reports progress and refreshes its heartbeat
+EXPORT_HEARTBEAT_SECONDS = getattr(settings, "EXPORT_HEARTBEAT_SECONDS", 30)
+
+# search_download parameters that change what an export contains
+EXPORT_PARAMS = ("type", "value", "from", "to", "status", "match")
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+jobs_collection = LazyCollection("export_jobs")
+data_versions_collection = LazyCollection("data_versions")
+
+
+# ----------------------
+# product_details version
+# ----------------------
+def product_details_changed():
+    """Invalidate cached exports after a write; failures are logged, not raised."""
+    try:
+        data_versions_collection.update_one({"_id": "product_details"}, {"$inc": {"version": 1}}, upsert=True)
+    except Exception as e:
+        logger.warning("Could not bump product_details version: %s", e)
+
+
+def data_version():
+    doc = data_versions_collection.find_one({"_id": "product_details"})
+    return doc.get("version", 0) if doc else 0
+
+
+# ----------------------
+# Jobs
+# ----------------------
+def export_params(source):
+    """The export-relevant parameters from a request body or query dict."""
+    return {name: str(source[name]) for name in EXPORT_PARAMS if source.get(name) not in (None, "")}
+
+
+def job_key(params, export_format):
+    payload = json.dumps({"params": params, "format": export_format}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def enqueue(params, export_format, username):
+    """Return (job, reused): an existing job for the same query and data, or a new queued one."""
+    key = job_key(params, export_format)
+    version = data_version()
+    existing = jobs_collection.find_one(
+        {"key": key, "dataVersion": version, "status": {"$in": ["queued", "running", "done"]}},
+        sort=[("created_at", -1)],
+    )
+    if existing is not None:
+        return existing, True
+    job = {
+        "key": key,
+        "params": params,
+        "format": export_format,
+        "dataVersion": version,
+        "status": "queued",
+        "rows": 0,
+        "passesDone": 0,
+        "passesTotal": None,
+        "size": None,
+        "createdBy": username,
+        "created_at": datetime.now(timezone.utc),
+    }
+    job["_id"] = jobs_collection.insert_one(job).inserted_id
+    return job, False
+
+
+def describe(job, current_version=None):
+    """Public view of a job document."""
+    total = job.get("passesTotal")
+    progress = None
+    if job.get("status") == "done":
+        progress = 1.0
+    elif total:
+        progress = round(min(job.get("passesDone", 0) / total, 1.0), 4)
+    elif total == 0:
+        progress = 0.0
+    job_id = str(job["_id"])
+    described = {
+        "id": job_id,
+        "status": job.get("status"),
+        "format": job.get("format"),
+        "params": job.get("params"),
+        "rows": job.get("rows", 0),
+        "passesDone": job.get("passesDone", 0),
+        "passesTotal": total,
+        "progress": progress,
+        "size": job.get("size"),
+        "createdBy": job.get("createdBy"),
+        "createdAt": job.get("created_at"),
+        "finishedAt": job.get("finished_at"),
+    }
+    if job.get("error"):
+        described["error"] = job["error"]
+    if job.get("status") == "done":
+        described["downloadUrl"] = f"/api/exports/{job_id}/file"
+    if current_version is not None:
+        described["stale"] = job.get("dataVersion") != current_version
+    return described
+
+
+def claim_next(worker_id):
+    """Atomically take the oldest queued (or orphaned running) job."""
+    now = datetime.now(timezone.utc)
+    return jobs_collection.find_one_and_update(
+        {"$or": [
+            {"status": "queued"},
+            {"status": "running", "heartbeat_at": {"$lt": now - timedelta(seconds=EXPORT_STALE_SECONDS)}},
+        ]},
+        {"$set": {"status": "running", "worker": worker_id, "started_at": now, "heartbeat_at": now}},
+        sort=[("created_at", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+def file_path(job):
+    return EXPORT_DIR / f"{job['_id']}.{EXPORT_FORMATS[job['format']].extension}"
+
+
+class ClaimLost(Exception):
+    """The job was requeued and claimed by another worker while this one ran it."""
+
+
+def _claimed(job):
+    """Filter matching the job only while this worker still holds its claim."""
+    return {"_id": job["_id"], "worker": job["worker"]}
+
+
+def run_job(job):
+    """Write one export to disk, updating progress on the job as passes are read.
+
+    A background thread refreshes the heartbeat every EXPORT_HEARTBEAT_SECONDS
+    however slowly the cursor or encoder moves. Every update is conditioned
+    on this worker's claim; once another worker has taken the job over this
+    one stops with ClaimLost.
+    """
+    from . import views
+
+    params = job["params"]
+    export_format = EXPORT_FORMATS[job["format"]]
+    query = views._build_search_query(params)
+    jobs_collection.update_one(_claimed(job), {"$set": {"passesTotal": views.collection.count_documents(query)}})
+
+    progress = {"passesDone": 0, "rows": 0}
+    stopped = threading.Event()
+    lost = threading.Event()
+
+    def heartbeat():
+        while not stopped.wait(EXPORT_HEARTBEAT_SECONDS):
+            try:
+                result = jobs_collection.update_one(_claimed(job), {"$set": {
+                    **progress, "heartbeat_at": datetime.now(timezone.utc),
+                }})
+            except Exception as e:
+                logger.warning("Export %s heartbeat failed: %s", job["_id"], e)
+                continue
+            if result.matched_count == 0:
+                lost.set()
+                return
+
+    def counted_docs(cursor):
+        for doc in cursor:
+            if lost.is_set():
+                raise ClaimLost(f"Export {job['_id']} was claimed by another worker")
+            yield doc
+            progress["passesDone"] += 1
+
+    def counted_rows(rows):
+        for row in rows:
+            progress["rows"] += 1
+            yield row
+
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    path = file_path(job)
+    # Unique per claim, so a worker that lost its claim never shares a partial file
+    partial = path.with_name(f"{path.name}.{secrets.token_hex(8)}.part")
+    beat = threading.Thread(target=heartbeat, name=f"export-heartbeat-{job['_id']}", daemon=True)
+    beat.start()
+    cursor = views._find_search_docs(query, params, views.EXPORT_PROJECTION, batch_size=views.EXPORT_BATCH_SIZE)
+    try:
+        with open(partial, "wb") as f:
+            rows = counted_rows(views._export_rows(counted_docs(cursor), params))
+            for chunk in export_format.encode(views.EXPORT_HEADER, rows):
+                f.write(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+        if lost.is_set():
+            raise ClaimLost(f"Export {job['_id']} was claimed by another worker")
+        os.replace(partial, path)
+    except Exception:
+        partial.unlink(missing_ok=True)
+        raise
+    finally:
+        stopped.set()
+        cursor.close()
+        beat.join()
+
+    result = jobs_collection.update_one(_claimed(job), {"$set": {
+        **progress,
+        "status": "done",
+        "size": path.stat().st_size,
+        "finished_at": datetime.now(timezone.utc),
+    }})
+    if result.matched_count == 0:
+        raise ClaimLost(f"Export {job['_id']} was claimed by another worker")
+
+
+def fail_job(job, error):
+    jobs_collection.update_one(_claimed(job), {"$set": {
+        "status": "failed", "error": error, "finished_at": datetime.now(timezone.utc),
+    }})
+
+
+def sweep():
+    """Delete jobs and files older than EXPORT_RETENTION_SECONDS; returns how many."""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=EXPORT_RETENTION_SECONDS)
+    removed = 0
+    for job in jobs_collection.find({"status": {"$in": ["done", "failed"]}, "finished_at": {"$lt": cutoff}}):
+        if job.get("format") in EXPORT_FORMATS:
+            file_path(job).unlink(missing_ok=True)
+        jobs_collection.delete_one({"_id": job["_id"]})
+        removed += 1
+    return removed
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# ----------------------
+# Download with Range support
+# ----------------------
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _parse_range(header, size):
+    """(start, end) inclusive for a single satisfiable byte range, None to send
+    the whole file, or False when the range cannot be satisfied."""
+    match = _RANGE.match(header.strip()) if header else None
+    if match is None:
+        return None  # absent, malformed or multi-range: ignore it
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(DOWNLOAD_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def file_response(request, job, filename):
+    """Serve a finished export, honouring Range and If-Range."""
+    path = file_path(job)
+    size = path.stat().st_size
+    etag = f'"{job["_id"]}-{size}"'
+    content_type = EXPORT_FORMATS[job["format"]].content_type
+
+    byte_range = _parse_range(request.headers.get("Range"), size)
+    if_range = request.headers.get("If-Range")
+    if if_range and if_range != etag:
+        byte_range = None
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+    elif byte_range is None:
+        response = FileResponse(open(path, "rb"), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(_read_range(path, start, end - start + 1), status=206, content_type=content_type)
+        response["Content-Length"] = str(end - start + 1)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,176 @@
+"""Declared Mongo indexes for the inventory database.
+
+Every index the views rely on is listed here; `manage.py ensure_indexes`
+creates them and the app warns at startup when any are missing.
+"""
+import logging
+
+from django.conf import settings
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+SESSION_TTL_SECONDS = getattr(settings, "SESSION_TTL_SECONDS", 24 * 60 * 60)
+
+# product_details documents written before projectNameKey existed
+UNKEYED_PROJECTS = {"projectNameKey": {"$exists": False}, "projectName": {"$type": "string"}}
+
+# collection -> list of (keys, options)
+INDEXES = {
+    "product_details": [
+        ([("passNo", 1)], {"unique": True}),
+        ([("dateIn", 1), ("passNo", 1)], {}),
+        ([("projectName", 1)], {}),
+        ([("projectNameKey", 1)], {}),
+        # Multikey indexes over the embedded items array
+        ([("items.partNumber", 1)], {}),
+        ([("items.serialNumber", 1)], {}),
+        # type=Text search; a collection can have only one text index
+        ([
+            ("items.defectDetails", "text"),
+            ("items.itemRectificationDetails", "text"),
+            ("items.itemFeedback1Details", "text"),
+            ("items.itemFeedback2Details", "text"),
+            ("items.itemName", "text"),
+        ], {"name": "items_text", "weights": {
+            "items.defectDetails": 5,
+            "items.itemRectificationDetails": 2,
+            "items.itemFeedback1Details": 1,
+            "items.itemFeedback2Details": 1,
+            "items.itemName": 3,
+        }}),
+    ],
+    "sessions": [
+        ([("token", 1)], {"unique": True}),
+        ([("user_id", 1)], {}),
+        ([("created_at", 1)], {"expireAfterSeconds": SESSION_TTL_SECONDS}),
+    ],
+    "users": [
+        ([("username", 1)], {"unique": True}),
+    ],
+    "admin_projects": [
+        ([("projectName", 1)], {"unique": True}),
+    ],
+    "export_jobs": [
+        ([("key", 1), ("dataVersion", 1)], {}),
+        ([("status", 1), ("created_at", 1)], {}),
+    ],
+}
+
+# Options whose value must match for an existing index to count as the declared one
+_COMPARED_OPTIONS = ("unique", "expireAfterSeconds", "collation", "weights")
+
+
+def _key_of(keys):
+    # Some tools store directions as floats (1.0); compare them as ints
+    normalized = [
+        (field, int(direction) if isinstance(direction, float) else direction)
+        for field, direction in keys
+    ]
+    # Text fields are compared as a set, see _existing_indexes
+    text = sorted(field for field, direction in normalized if direction == "text")
+    return tuple(
+        [(field, direction) for field, direction in normalized if direction != "text"]
+        + [(field, "text") for field in text]
+    )
+
+
+def _existing_indexes(coll):
+    existing = {}
+    for name, info in coll.index_information().items():
+        if name == "_id_":
+            continue
+        keys = info["key"]
+        if "weights" in info:
+            # Mongo stores a text index as _fts/_ftsx keys with the fields in weights
+            keys = [(f, d) for f, d in keys if f not in ("_fts", "_ftsx")]
+            keys += [(field, "text") for field in info["weights"]]
+        existing[_key_of(keys)] = (name, info)
+    return existing
+
+
+def _option_drift(options, info):
+    drift = {}
+    for option in _COMPARED_OPTIONS:
+        if option == "weights" and option not in options:
+            continue
+        wanted = options.get(option)
+        actual = info.get(option)
+        if option == "weights":
+            wanted, actual = dict(wanted), dict(actual or {})
+        if option == "unique":
+            wanted, actual = bool(wanted), bool(actual)
+        if wanted != actual:
+            drift[option] = {"declared": wanted, "actual": actual}
+    return drift
+
+
+def check_indexes(db):
+    """Compare declared indexes with the database.
+
+    Returns a dict with "missing", "mismatched" and "extra" lists of
+    (collection, index description) entries.
+    """
+    report = {"missing": [], "mismatched": [], "extra": []}
+    for coll_name, declared in INDEXES.items():
+        existing = _existing_indexes(db[coll_name])
+        declared_keys = set()
+        for keys, options in declared:
+            key = _key_of(keys)
+            declared_keys.add(key)
+            if key not in existing:
+                report["missing"].append((coll_name, keys))
+                continue
+            name, info = existing[key]
+            drift = _option_drift(options, info)
+            if drift:
+                report["mismatched"].append((coll_name, name, drift))
+        for key, (name, _) in existing.items():
+            if key not in declared_keys:
+                report["extra"].append((coll_name, name))
+    return report
+
+
+def ensure_indexes(db):
+    """Create every declared index that is missing.
+
+    Existing indexes are left alone, so running this repeatedly is a no-op.
+    Returns (created, errors) as lists of (collection, name or error) tuples.
+    """
+    created, errors = [], []
+    for coll_name, declared in INDEXES.items():
+        coll = db[coll_name]
+        existing = _existing_indexes(coll)
+        for keys, options in declared:
+            if _key_of(keys) in existing:
+                continue
+            try:
+                name = coll.create_index(keys, background=True, **options)
+                created.append((coll_name, name))
+            except OperationFailure as e:
+                # e.g. a unique index over data that already has duplicates
+                errors.append((coll_name, f"{keys}: {e}"))
+    return created, errors
+
+
+def warn_missing_indexes(db):
+    """Log a warning for each declared index the database does not have."""
+    try:
+        report = check_indexes(db)
+    except Exception as e:
+        logger.warning("Could not verify Mongo indexes: %s", e)
+        return
+    for coll_name, keys in report["missing"]:
+        logger.warning("Missing index on %s: %s (run `manage.py ensure_indexes`)", coll_name, keys)
+    for coll_name, name, drift in report["mismatched"]:
+        logger.warning("Index %s on %s differs from declaration: %s", name, coll_name, drift)
+    try:
+        unkeyed = db["product_details"].find_one(UNKEYED_PROJECTS, {"_id": 1})
+    except Exception as e:
+        logger.warning("Could not check projectNameKey backfill: %s", e)
+        return
+    if unkeyed is not None:
+        logger.warning(
+            "product_details has documents without projectNameKey; ProjectName searches fall back "
+            "to a projectName regex until `manage.py backfill_project_keys` is run"
+        )
@@ -0,0 +1,125 @@
+"""Background, batched writer for the api_logs collection."""
+import atexit
+import os
+import queue
+import threading
+import time
+
+
+class ApiLogWriter:
+    """Queue log entries in memory and flush them with insert_many from a worker thread.
+
+    overflow_policy decides what happens when the queue is full:
+    "drop" discards the new entry (and counts it), "block" waits up to
+    block_timeout seconds for space before dropping.
+    """
+
+    def __init__(self, get_collection, max_queue=10000, batch_size=200,
+                 flush_interval=1.0, overflow_policy="drop", block_timeout=0.05):
+        if overflow_policy not in ("drop", "block"):
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+        self._get_collection = get_collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stopping = threading.Event()
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        atexit.register(self.shutdown)
+
+    def _ensure_worker(self):
+        # Threads do not survive fork, so each worker process starts its own
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+            self._pid = os.getpid()
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="api-log-writer", daemon=True)
+            self._thread.start()
+
+    def enqueue(self, entry):
+        self._ensure_worker()
+        try:
+            if self.overflow_policy == "block":
+                self._queue.put(entry, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(entry)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        with self._lock:
+            self.enqueued += 1
+        return True
+
+    def _drain(self, first=None):
+        batch = [] if first is None else [first]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        if not batch:
+            return
+        try:
+            self._get_collection().insert_many(batch, ordered=False)
+            with self._lock:
+                self.written += len(batch)
+        except Exception:
+            # Logging must never take the API down; count the loss and move on
+            with self._lock:
+                self.failed += len(batch)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            deadline = time.monotonic() + self.flush_interval
+            batch = []
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write(batch)
+        self.flush()
+
+    def flush(self):
+        """Write everything currently queued from the calling thread."""
+        while True:
+            batch = self._drain()
+            if not batch:
+                return
+            self._write(batch)
+
+    def shutdown(self, timeout=5.0):
+        self._stopping.set()
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid() and thread.is_alive():
+            thread.join(timeout)
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+            }
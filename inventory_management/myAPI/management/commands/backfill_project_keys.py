@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from myAPI.indexes import UNKEYED_PROJECTS
+from myAPI.views import collection
+
+
+class Command(BaseCommand):
+    help = "Set projectNameKey on product_details documents written before it existed."
+
+    def handle(self, *args, **options):
+        # Computed server-side in one pipeline update, no documents leave Mongo
+        result = collection.update_many(
+            UNKEYED_PROJECTS,
+            [{"$set": {"projectNameKey": {"$toLower": {"$trim": {"input": "$projectName"}}}}}],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {result.modified_count} documents"))
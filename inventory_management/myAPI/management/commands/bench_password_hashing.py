@@ -0,0 +1,55 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, ScryptPasswordHasher
+from django.core.management.base import BaseCommand
+
+from myAPI.passwords import HashingPool
+
+
+class Command(BaseCommand):
+    help = "Report password verifications (logins) per second at each hashing cost."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--algorithm", choices=["pbkdf2", "scrypt"], default="pbkdf2")
+        parser.add_argument(
+            "--costs",
+            default="100000,300000,600000,1000000",
+            help="Comma-separated PBKDF2 iterations or scrypt work factors.",
+        )
+        parser.add_argument("--workers", type=int, default=4, help="Hashing pool size.")
+        parser.add_argument("--clients", type=int, default=16, help="Concurrent simulated logins.")
+        parser.add_argument("--seconds", type=float, default=5.0, help="Duration per cost.")
+
+    def _hasher(self, algorithm, cost):
+        if algorithm == "scrypt":
+            hasher = ScryptPasswordHasher()
+            hasher.work_factor = cost
+        else:
+            hasher = PBKDF2PasswordHasher()
+            hasher.iterations = cost
+        return hasher
+
+    def handle(self, *args, **options):
+        costs = [int(c) for c in options["costs"].split(",") if c.strip()]
+        self.stdout.write(f"{'cost':>10}  {'logins/s':>10}  {'ms/login':>10}")
+        for cost in costs:
+            hasher = self._hasher(options["algorithm"], cost)
+            encoded = hasher.encode("bench-password", hasher.salt())
+            pool = HashingPool(workers=options["workers"], backlog=options["clients"], wait_seconds=60)
+            deadline = time.monotonic() + options["seconds"]
+
+            def client():
+                done = 0
+                while time.monotonic() < deadline:
+                    pool.run(hasher.verify, "bench-password", encoded)
+                    done += 1
+                return done
+
+            started = time.monotonic()
+            with ThreadPoolExecutor(max_workers=options["clients"]) as clients:
+                total = sum(clients.map(lambda _: client(), range(options["clients"])))
+            elapsed = time.monotonic() - started
+            rate = total / elapsed if elapsed else 0.0
+            per_login = (elapsed * options["workers"] / total * 1000) if total else 0.0
+            self.stdout.write(f"{cost:>10}  {rate:>10.1f}  {per_login:>10.1f}")
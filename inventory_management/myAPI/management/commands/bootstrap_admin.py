@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from myAPI.views import ensure_default_admin
+
+
+class Command(BaseCommand):
+    help = "Create the default admin user when the users collection is empty."
+
+    def handle(self, *args, **options):
+        if ensure_default_admin():
+            self.stdout.write(self.style.SUCCESS("Created default admin user 'admin'"))
+        else:
+            self.stdout.write("Users already exist; nothing to do.")
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from myAPI.indexes import check_indexes, ensure_indexes
+from myAPI.db import get_db
+
+
+class Command(BaseCommand):
+    help = "Create the declared Mongo indexes and report drift from the declaration."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report missing, mismatched and undeclared indexes.",
+        )
+
+    def handle(self, *args, **options):
+        db = get_db()
+        if not options["check"]:
+            created, errors = ensure_indexes(db)
+            for coll_name, name in created:
+                self.stdout.write(self.style.SUCCESS(f"Created {coll_name}.{name}"))
+            for coll_name, error in errors:
+                self.stderr.write(self.style.ERROR(f"Failed on {coll_name}: {error}"))
+            if not created and not errors:
+                self.stdout.write("All declared indexes already exist.")
+
+        report = check_indexes(db)
+        for coll_name, keys in report["missing"]:
+            self.stdout.write(self.style.WARNING(f"Missing: {coll_name} {keys}"))
+        for coll_name, name, drift in report["mismatched"]:
+            self.stdout.write(self.style.WARNING(f"Mismatched: {coll_name}.{name} {drift}"))
+        for coll_name, name in report["extra"]:
+            self.stdout.write(f"Undeclared: {coll_name}.{name}")
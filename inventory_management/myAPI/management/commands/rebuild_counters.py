@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from myAPI import counters
+from myAPI.views import collection, counters_collection
+
+
+class Command(BaseCommand):
+    help = "Recompute the live In/Out inventory counters from product_details."
+
+    def handle(self, *args, **options):
+        written = counters.rebuild(collection, counters_collection)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} counters"))
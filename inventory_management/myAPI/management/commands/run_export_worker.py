@@ -0,0 +1,46 @@
+import time
+import traceback
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from myAPI import exports
+
+
+class Command(BaseCommand):
+    help = "Run queued background exports (POST /api/exports) and clean up expired files."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Exit when the queue is empty.")
+        parser.add_argument(
+            "--poll", type=float, default=getattr(settings, "EXPORT_WORKER_POLL_SECONDS", 2.0),
+            help="Seconds to wait between polls of an empty queue.",
+        )
+
+    def handle(self, *args, **options):
+        worker_id = exports.worker_id()
+        self.stdout.write(f"Export worker {worker_id} writing to {exports.EXPORT_DIR}")
+        last_sweep = 0.0
+        while True:
+            if time.monotonic() - last_sweep > 60:
+                removed = exports.sweep()
+                if removed:
+                    self.stdout.write(f"Removed {removed} expired exports")
+                last_sweep = time.monotonic()
+
+            job = exports.claim_next(worker_id)
+            if job is None:
+                if options["once"]:
+                    return
+                time.sleep(options["poll"])
+                continue
+
+            started = time.monotonic()
+            try:
+                exports.run_job(job)
+                self.stdout.write(self.style.SUCCESS(f"Export {job['_id']} done in {time.monotonic() - started:.1f}s"))
+            except exports.ClaimLost as e:
+                self.stderr.write(f"{e}; abandoning it")
+            except Exception as e:
+                exports.fail_job(job, str(e))
+                self.stderr.write(f"Export {job['_id']} failed: {e}\n{traceback.format_exc()}")
@@ -0,0 +1,282 @@
+"""Per-view latency histograms and Mongo command accounting.
+
+MetricsMiddleware opens a RequestStats for every request. The pymongo
+CommandListener and the timed() spans around auth and logging add to it,
+the middleware folds it into process-wide totals and a Server-Timing header,
+and /api/metrics renders the totals in Prometheus text format. Streaming
+responses are recorded when they are closed, so the time and Mongo work
+spent producing the body count towards their view.
+
+Everything here is off when settings.MYAPI_METRICS_ENABLED is false.
+
+Metrics live in each worker process, so a scrape reports the worker that
+answered it.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from pymongo import monitoring
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+ENABLED = getattr(settings, "MYAPI_METRICS_ENABLED", True)
+COUNT_COMMAND_BYTES = getattr(settings, "MYAPI_METRICS_COMMAND_BYTES", False)
+
+
+class RequestStats:
+    __slots__ = ("view", "mongo_commands", "mongo_seconds", "mongo_bytes", "spans")
+
+    def __init__(self):
+        self.view = "-"
+        self.mongo_commands = 0
+        self.mongo_seconds = 0.0
+        self.mongo_bytes = 0
+        self.spans = {}
+
+    def add_span(self, name, seconds):
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+
+current_request = contextvars.ContextVar("myapi_request_stats", default=None)
+
+
+@contextmanager
+def timed(span):
+    """Attribute the enclosed block's wall time to span on the active request."""
+    stats = current_request.get()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.add_span(span, time.perf_counter() - started)
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += value
+        self.count += 1
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = {}  # view -> Histogram
+        self.responses = {}  # (view, status) -> count
+        self.mongo = {}  # (view, command) -> [count, seconds, bytes]
+        self.spans = {}  # (view, span) -> seconds
+        self.collectors = []
+
+    def record_request(self, view, status, seconds, stats):
+        with self._lock:
+            self.latency.setdefault(view, Histogram()).observe(seconds)
+            self.responses[(view, status)] = self.responses.get((view, status), 0) + 1
+            for span, span_seconds in stats.spans.items():
+                self.spans[(view, span)] = self.spans.get((view, span), 0.0) + span_seconds
+
+    def record_command(self, view, command, seconds, size):
+        with self._lock:
+            entry = self.mongo.setdefault((view, command), [0, 0.0, 0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] += size
+
+    def add_collector(self, collect):
+        """collect() returns (name, help, type, [(labels dict, value)]) tuples for /api/metrics."""
+        self.collectors.append(collect)
+
+    def render(self):
+        lines = []
+
+        def family(name, help_text, kind):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            family("myapi_request_duration_seconds", "Request latency by view.", "histogram")
+            for view, hist in sorted(self.latency.items()):
+                cumulative = 0
+                for bound, n in zip(hist.buckets, hist.counts):
+                    cumulative += n
+                    lines.append(f'myapi_request_duration_seconds_bucket{{view="{_escape(view)}",le="{bound}"}} {cumulative}')
+                lines.append(f'myapi_request_duration_seconds_bucket{{view="{_escape(view)}",le="+Inf"}} {hist.count}')
+                lines.append(f'myapi_request_duration_seconds_sum{{view="{_escape(view)}"}} {hist.total}')
+                lines.append(f'myapi_request_duration_seconds_count{{view="{_escape(view)}"}} {hist.count}')
+
+            family("myapi_responses_total", "Responses by view and status code.", "counter")
+            for (view, status), n in sorted(self.responses.items()):
+                lines.append(f'myapi_responses_total{{view="{_escape(view)}",status="{status}"}} {n}')
+
+            family("myapi_span_seconds_total", "Time spent in auth, logging and other spans by view.", "counter")
+            for (view, span), seconds in sorted(self.spans.items()):
+                lines.append(f'myapi_span_seconds_total{{view="{_escape(view)}",span="{_escape(span)}"}} {seconds}')
+
+            family("myapi_mongo_commands_total", "Mongo commands issued by view.", "counter")
+            for (view, command), (n, _, _) in sorted(self.mongo.items()):
+                lines.append(f'myapi_mongo_commands_total{{view="{_escape(view)}",command="{command}"}} {n}')
+            family("myapi_mongo_command_seconds_total", "Mongo command time by view.", "counter")
+            for (view, command), (_, seconds, _) in sorted(self.mongo.items()):
+                lines.append(f'myapi_mongo_command_seconds_total{{view="{_escape(view)}",command="{command}"}} {seconds}')
+            if COUNT_COMMAND_BYTES:
+                family("myapi_mongo_reply_bytes_total", "BSON bytes of Mongo replies by view.", "counter")
+                for (view, command), (_, _, size) in sorted(self.mongo.items()):
+                    lines.append(f'myapi_mongo_reply_bytes_total{{view="{_escape(view)}",command="{command}"}} {size}')
+            collectors = list(self.collectors)
+
+        for collect in collectors:
+            for name, help_text, kind, samples in collect():
+                family(name, help_text, kind)
+                for labels, value in samples:
+                    label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                    lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = Registry()
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Attribute Mongo command count, time and (optionally) reply size to the active request."""
+
+    def started(self, event):
+        pass
+
+    def _record(self, event, reply=None):
+        stats = current_request.get()
+        seconds = event.duration_micros / 1e6
+        size = 0
+        if COUNT_COMMAND_BYTES and reply is not None:
+            import bson
+            size = len(bson.encode(reply))
+        view = "-"  # background work such as the api_logs writer
+        if stats is not None:
+            stats.mongo_commands += 1
+            stats.mongo_seconds += seconds
+            stats.mongo_bytes += size
+            view = stats.view
+        registry.record_command(view, event.command_name, seconds, size)
+
+    def succeeded(self, event):
+        self._record(event, event.reply)
+
+    def failed(self, event):
+        self._record(event)
+
+
+command_listener = CommandMetrics()
+
+
+def view_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    func = match.func
+    return getattr(func, "__name__", None) or match.view_name or "unknown"
+
+
+def start_request():
+    stats = RequestStats()
+    return stats, current_request.set(stats)
+
+
+class _StreamingStats:
+    """Streaming content that runs under the request's stats and records them once closed."""
+
+    def __init__(self, iterable, stats, finish):
+        self._iterator = iter(iterable)
+        self._stats = stats
+        self._finish = finish
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        token = current_request.set(self._stats)
+        try:
+            return next(self._iterator)
+        finally:
+            current_request.reset(token)
+
+    def close(self):
+        finish, self._finish = self._finish, None
+        if finish is not None:
+            finish()
+
+
+class _AsyncStreamingStats:
+    """Async counterpart of _StreamingStats for responses with an async body."""
+
+    def __init__(self, iterable, stats, finish):
+        self._iterator = aiter(iterable)
+        self._stats = stats
+        self._finish = finish
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        token = current_request.set(self._stats)
+        try:
+            return await anext(self._iterator)
+        finally:
+            current_request.reset(token)
+
+    def close(self):
+        finish, self._finish = self._finish, None
+        if finish is not None:
+            finish()
+
+
+def _server_timing(response, seconds, stats):
+    timings = [f"app;dur={seconds * 1000:.1f}"]
+    if stats.mongo_commands:
+        timings.append(f'mongo;dur={stats.mongo_seconds * 1000:.1f};desc="{stats.mongo_commands} commands"')
+    for span, span_seconds in stats.spans.items():
+        timings.append(f"{span};dur={span_seconds * 1000:.1f}")
+    response["Server-Timing"] = ", ".join(timings)
+
+
+def finish_request(request, response, stats, token, started):
+    current_request.reset(token)
+    view = view_name(request)
+
+    def record():
+        registry.record_request(view, response.status_code, time.perf_counter() - started, stats)
+
+    # Server-Timing can only cover the work done before the headers go out
+    _server_timing(response, time.perf_counter() - started, stats)
+    if response.streaming:
+        # Django closes the wrapper after the existing closers (cursor, admission ticket)
+        wrapper = _AsyncStreamingStats if getattr(response, "is_async", False) else _StreamingStats
+        response.streaming_content = wrapper(response.streaming_content, stats, record)
+    else:
+        record()
+    return response
+
+
+def set_view(request):
+    """Label Mongo commands issued from here on with the resolved view name."""
+    stats = current_request.get()
+    if stats is not None:
+        stats.view = view_name(request)
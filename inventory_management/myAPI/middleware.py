@@ -0,0 +1,76 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+
+from . import metrics, renderers
+
+
+class MetricsMiddleware:
+    """Time every request, attribute Mongo work to its view and add Server-Timing."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not metrics.ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        stats, token = metrics.start_request()
+        response = self.get_response(request)
+        return metrics.finish_request(request, response, stats, token, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        stats, token = metrics.start_request()
+        response = await self.get_response(request)
+        return metrics.finish_request(request, response, stats, token, started)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics.set_view(request)
+        return None
+
+
+class ContentNegotiationMiddleware:
+    """Have ApiResponse render MessagePack for clients that accept it."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = renderers.wants_msgpack.set(renderers.accepts_msgpack(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            renderers.wants_msgpack.reset(token)
+        return self._vary(response)
+
+    async def __acall__(self, request):
+        token = renderers.wants_msgpack.set(renderers.accepts_msgpack(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            renderers.wants_msgpack.reset(token)
+        return self._vary(response)
+
+    def _vary(self, response):
+        if renderers.msgpack is not None and isinstance(response, renderers.ApiResponse):
+            patch_vary_headers(response, ("Accept",))
+        return response
@@ -0,0 +1,125 @@
+"""Password hashing on a bounded worker pool.
+
+Hashes use Django's hasher framework (settings.PASSWORD_HASHERS, first entry
+preferred) with cost parameters taken from settings. Each hash costs tens of
+milliseconds of CPU, so the work runs on a small thread pool (hashlib
+releases the GIL while hashing) and callers get HasherBusy instead of
+queueing without bound during a login rush.
+
+Hashes from before the move to Django's hashers, a bare hex SHA-256 over a
+constant salt, are still accepted and replaced on the next successful login.
+"""
+import hashlib
+import hmac
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+    check_password,
+    make_password,
+)
+
+LEGACY_SALT = "bel_simple_salt"
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = getattr(settings, "PASSWORD_PBKDF2_ITERATIONS", PBKDF2PasswordHasher.iterations)
+
+
+class TunableScryptPasswordHasher(ScryptPasswordHasher):
+    work_factor = getattr(settings, "PASSWORD_SCRYPT_WORK_FACTOR", ScryptPasswordHasher.work_factor)
+    block_size = getattr(settings, "PASSWORD_SCRYPT_BLOCK_SIZE", ScryptPasswordHasher.block_size)
+    parallelism = getattr(settings, "PASSWORD_SCRYPT_PARALLELISM", ScryptPasswordHasher.parallelism)
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing pool already has its maximum backlog."""
+
+
+class HashingPool:
+    """Bounded executor for CPU-heavy hashing, created lazily in each process."""
+
+    def __init__(self, workers, backlog, wait_seconds):
+        self.workers = workers
+        self.wait_seconds = wait_seconds
+        self._slots = threading.BoundedSemaphore(workers + backlog)
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+                self._pid = os.getpid()
+            return self._executor
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.wait_seconds):
+            with self._lock:
+                self.rejected += 1
+            raise HasherBusy("Password hashing is busy, retry shortly")
+        try:
+            return self._get_executor().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+
+pool = HashingPool(
+    workers=getattr(settings, "PASSWORD_HASH_WORKERS", 4),
+    backlog=getattr(settings, "PASSWORD_HASH_BACKLOG", 64),
+    wait_seconds=getattr(settings, "PASSWORD_HASH_WAIT_SECONDS", 2.0),
+)
+
+
+def legacy_hash(password: str) -> str:
+    return hashlib.sha256((LEGACY_SALT + password).encode("utf-8")).hexdigest()
+
+
+def is_legacy_hash(encoded) -> bool:
+    return isinstance(encoded, str) and len(encoded) == 64 and "$" not in encoded
+
+
+def _verify(password, encoded):
+    if is_legacy_hash(encoded):
+        if not hmac.compare_digest(legacy_hash(password), encoded):
+            return False, None
+        return True, make_password(password)
+    rehashed = []
+    ok = check_password(password, encoded, setter=lambda raw: rehashed.append(make_password(raw)))
+    return ok, (rehashed[0] if ok and rehashed else None)
+
+
+def hash_password(password: str) -> str:
+    """Hash with the preferred hasher on the pool; raises HasherBusy."""
+    return pool.run(make_password, password)
+
+
+_dummy_hash = None
+_dummy_lock = threading.Lock()
+
+
+def _get_dummy_hash():
+    global _dummy_hash
+    with _dummy_lock:
+        if _dummy_hash is None:
+            _dummy_hash = make_password(os.urandom(16).hex())
+        return _dummy_hash
+
+
+def verify_password(password: str, encoded) -> tuple[bool, str | None]:
+    """Return (matches, new_hash); new_hash is set when the stored hash is outdated.
+
+    With no stored hash (unknown user) a dummy hash is still checked, so the
+    response time does not reveal whether the username exists. Runs on the
+    pool and raises HasherBusy when it is saturated.
+    """
+    if not encoded:
+        pool.run(_verify, password, _dummy_hash or pool.run(_get_dummy_hash))
+        return False, None
+    return pool.run(_verify, password, encoded)
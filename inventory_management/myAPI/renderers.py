@@ -0,0 +1,91 @@
+"""JSON (and optional MessagePack) encoding for API responses.
+
+ApiResponse is a drop-in for JsonResponse. It encodes with orjson when
+installed and falls back to the stdlib encoder otherwise. Either way, dates,
+datetimes, times and Decimals are rendered exactly as DjangoJSONEncoder
+renders them, and ObjectIds are rendered as their hex string.
+
+When the client sends `Accept: application/msgpack` and msgpack is
+installed, ContentNegotiationMiddleware asks for MessagePack instead, with
+the same value conversions.
+"""
+import contextvars
+import datetime
+import decimal
+import json
+import uuid
+
+from bson import ObjectId
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the deployment
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depends on the deployment
+    msgpack = None
+
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+
+_django_encoder = DjangoJSONEncoder()
+
+
+def _default(o):
+    if isinstance(o, ObjectId):
+        return str(o)
+    return _django_encoder.default(o)
+
+
+class ApiJSONEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        if isinstance(o, ObjectId):
+            return str(o)
+        return super().default(o)
+
+
+if orjson is not None:
+    # Dates and times go through _default so their text matches DjangoJSONEncoder
+    _ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def dumps(data) -> bytes:
+        return orjson.dumps(data, default=_default, option=_ORJSON_OPTIONS)
+else:
+    def dumps(data) -> bytes:
+        return json.dumps(data, cls=ApiJSONEncoder).encode("utf-8")
+
+
+def _msgpack_default(o):
+    if isinstance(o, (datetime.datetime, datetime.date, datetime.time, datetime.timedelta, decimal.Decimal, uuid.UUID)):
+        return _django_encoder.default(o)
+    return _default(o)
+
+
+def dumps_msgpack(data) -> bytes:
+    return msgpack.packb(data, default=_msgpack_default, use_bin_type=True, datetime=False)
+
+
+# Set per request by ContentNegotiationMiddleware
+wants_msgpack = contextvars.ContextVar("myapi_wants_msgpack", default=False)
+
+
+def accepts_msgpack(request) -> bool:
+    return msgpack is not None and MSGPACK_CONTENT_TYPE in request.headers.get("Accept", "")
+
+
+class ApiResponse(HttpResponse):
+    """JsonResponse with a faster encoder and optional MessagePack output."""
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError("In order to allow non-dict objects to be serialized set the safe parameter to False.")
+        if wants_msgpack.get():
+            kwargs.setdefault("content_type", MSGPACK_CONTENT_TYPE)
+            content = dumps_msgpack(data)
+        else:
+            kwargs.setdefault("content_type", "application/json")
+            content = dumps(data)
+        super().__init__(content=content, **kwargs)
@@ -0,0 +1,143 @@
+"""In-process prefix indexes behind /api/search/suggestions."""
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+
+
+def normalize(value):
+    return str(value).strip().lower()
+
+
+class PrefixIndex:
+    """Case-insensitive prefix lookup over a multiset of strings.
+
+    Values are reference counted so a value shared by several passes stays
+    suggestible until the last one goes away.
+    """
+
+    def __init__(self):
+        self._keys = []  # sorted normalized keys
+        self._values = {}  # normalized key -> Counter of original spellings
+        self._lock = threading.Lock()
+
+    def add(self, value):
+        if not value:
+            return
+        key = normalize(value)
+        with self._lock:
+            spellings = self._values.get(key)
+            if spellings is None:
+                spellings = self._values[key] = Counter()
+                insort(self._keys, key)
+            spellings[value] += 1
+
+    def remove(self, value):
+        if not value:
+            return
+        key = normalize(value)
+        with self._lock:
+            spellings = self._values.get(key)
+            if spellings is None or spellings[value] <= 0:
+                return
+            spellings[value] -= 1
+            if spellings[value] <= 0:
+                del spellings[value]
+            if not spellings:
+                del self._values[key]
+                del self._keys[bisect_left(self._keys, key)]
+
+    def search(self, prefix, limit=10):
+        prefix = normalize(prefix)
+        results = []
+        with self._lock:
+            i = bisect_left(self._keys, prefix)
+            while i < len(self._keys) and len(results) < limit:
+                key = self._keys[i]
+                if not key.startswith(prefix):
+                    break
+                for value in self._values[key]:
+                    results.append(value)
+                    if len(results) >= limit:
+                        break
+                i += 1
+        return results
+
+    def replace(self, values):
+        """Swap in a freshly built set of values in one step."""
+        keys, spellings = [], {}
+        for value in values:
+            if not value:
+                continue
+            key = normalize(value)
+            if key not in spellings:
+                spellings[key] = Counter()
+                keys.append(key)
+            spellings[key][value] += 1
+        keys.sort()
+        with self._lock:
+            self._keys, self._values = keys, spellings
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class SuggestionIndex:
+    """The passNo, partNumber and projectName prefix indexes.
+
+    load() must return three iterables (pass numbers, part numbers, project
+    names). The indexes are built once per process and rebuilt in the
+    background every refresh_seconds to pick up writes made by other workers.
+    """
+
+    def __init__(self, load, refresh_seconds=300):
+        self._load = load
+        self.refresh_seconds = refresh_seconds
+        self.pass_no = PrefixIndex()
+        self.part_number = PrefixIndex()
+        self.project_name = PrefixIndex()
+        self._built_at = None
+        self._build_lock = threading.Lock()
+        self._refreshing = False
+
+    @property
+    def built(self):
+        return self._built_at is not None
+
+    def _build(self):
+        pass_nos, part_numbers, project_names = self._load()
+        self.pass_no.replace(pass_nos)
+        self.part_number.replace(part_numbers)
+        self.project_name.replace(project_names)
+        self._built_at = time.monotonic()
+
+    def build(self):
+        with self._build_lock:
+            self._build()
+
+    def _refresh(self):
+        try:
+            self.build()
+        except Exception:
+            pass  # keep serving the previous snapshot
+        finally:
+            self._refreshing = False
+
+    def ensure_built(self):
+        """Build synchronously on first use, then refresh in the background."""
+        if self._built_at is None:
+            with self._build_lock:
+                if self._built_at is None:
+                    self._build()
+            return
+        if self.refresh_seconds and not self._refreshing and \
+                time.monotonic() - self._built_at > self.refresh_seconds:
+            self._refreshing = True
+            threading.Thread(target=self._refresh, name="suggestion-refresh", daemon=True).start()
+
+    def lookup(self, search_type):
+        return {
+            "passNo": self.pass_no,
+            "ItemPartNo": self.part_number,
+            "ProjectName": self.project_name,
+        }.get(search_type)
@@ -1,28 +1,48 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+if getattr(settings, "MYAPI_ASYNC_VIEWS", False):
+    # Same routes, served by the async driver under ASGI
+    from . import async_views as read_views
+else:
+    read_views = views
+
 urlpatterns = [
+    path('health', views.health),  # GET /api/health
+    path('metrics', views.metrics_view),  # GET /api/metrics (Prometheus text format)
+
     # auth and admin
     path('login', views.login),  # POST /api/login
-    path('validate-token', views.validate_token),  # GET /api/validate-token
+    path('validate-token', read_views.validate_token),  # GET /api/validate-token
     path('logout', views.logout),  # POST /api/logout
     path('admin/users', views.admin_add_user),  # POST /api/admin/users
 
     # item in/out and CRUD by passNo
     path('items/in', views.items_in),  # POST /api/items/in
-    path('items/<str:pass_no>', views.edit_record),  # GET/PUT/DELETE /api/items/:passNo
+    path('items/in/bulk', views.items_in_bulk),  # POST /api/items/in/bulk (NDJSON or CSV upload)
+    path('items/<str:pass_no>', read_views.edit_record),  # GET/PUT/DELETE /api/items/:passNo
+    path('items/out/bulk', views.update_items_out_bulk),  # PUT /api/items/out/bulk (before the passNo route)
     path('items/out/<str:pass_no>', views.update_item_out),  # PUT /api/items/out/:passNo
 
     # search
-    path('search', views.search),  # GET /api/search
-    path('search/download', views.search_download),  # GET /api/search/download
-    path('search/suggestions', views.search_suggestions),  # GET /api/search/suggestions
+    path('search', read_views.search),  # GET /api/search
+    path('search/download', read_views.search_download),  # GET /api/search/download
+    path('search/suggestions', read_views.search_suggestions),  # GET /api/search/suggestions
+
+    # background exports
+    path('exports', views.exports_create),  # POST /api/exports
+    path('exports/<str:job_id>', views.export_status),  # GET /api/exports/:id
+    path('exports/<str:job_id>/file', read_views.export_file),  # GET /api/exports/:id/file (Range supported)
+
+    # inventory counters
+    path('stats', views.stats),  # GET /api/stats
 
     # Admin Projects
     path('admin/projects/add', views.admin_add_project),  # POST /api/admin/projects/add
     path('admin/projects/items/add', views.admin_add_item),  # POST /api/admin/projects/items/add
     path('admin/projects/items/edit', views.admin_edit_item),  # PUT /api/admin/projects/items/edit
     path('admin/projects/items/delete', views.admin_delete_item),  # DELETE /api/admin/projects/items/delete
-    path('admin/projects/list', views.admin_get_projects),  # GET /api/admin/projects/list
-    path('admin/projects/items', views.admin_get_project_items),  # GET /api/admin/projects/items?projectName=...
+    path('admin/projects/list', read_views.admin_get_projects),  # GET /api/admin/projects/list
+    path('admin/projects/items', read_views.admin_get_project_items),  # GET /api/admin/projects/items?projectName=...
 ]